@@ -9,44 +9,70 @@ All results and plots are saved in the outputs/ folder.
 import os
 import numpy as np
 import trimesh
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from scipy.spatial import cKDTree
+from scipy.spatial.transform import Rotation
 
 # Ensure output folder exists
 os.makedirs("outputs", exist_ok=True)
 
 def load_vertices(path):
     mesh = trimesh.load(path, process=False)
-    return np.asarray(mesh.vertices), mesh
+    return np.ascontiguousarray(mesh.vertices, dtype=np.float32), mesh
 
 def normalize_unit_sphere(vertices):
-    """Normalize vertices into unit sphere coordinates."""
-    centroid = vertices.mean(axis=0)
+    """Normalize (..., N, 3) vertices into unit sphere coordinates."""
+    centroid = vertices.mean(axis=-2, keepdims=True)
     centered = vertices - centroid
-    radius = np.max(np.linalg.norm(centered, axis=1))
-    normalized = centered / radius
-    return normalized, centroid, radius
+    sq_radius = np.einsum("...ij,...ij->...i", centered, centered).max(axis=-1, keepdims=True)
+    radius = np.sqrt(sq_radius)[..., None]
+    centered *= 1.0 / radius
+    return centered, centroid, radius
 
 def denormalize_unit_sphere(vertices, centroid, radius):
     """Restore vertices back to original space."""
     return vertices * radius + centroid
 
-def adaptive_quantize(vertices, n_bins=1024, k=10):
-    """Adaptive quantization based on local vertex density."""
-    tree = cKDTree(vertices)
-    dists, _ = tree.query(vertices, k=k)
-    density = 1.0 / (np.mean(dists, axis=1) + 1e-8)
+def build_knn_tree(vertices):
+    """Build the kd-tree used for density estimation over these vertices."""
+    return cKDTree(np.asarray(vertices, dtype=np.float64), leafsize=32, balanced_tree=False, compact_nodes=False)
+
+def knn_distance_sum(vertices, k=10, tree=None):
+    """Sum of distances to the k nearest neighbours, excluding self; `tree` must be built from these vertices."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if tree is None:
+        tree = build_knn_tree(vertices)
+    elif tree.n != len(vertices):
+        raise ValueError(f"kd-tree holds {tree.n} points but {len(vertices)} vertices were given")
+    dists, _ = tree.query(vertices, k=k + 1, workers=-1)
+    return dists[:, 1:].sum(axis=1)
+
+def knn_density(vertices, k=10, tree=None):
+    """Local vertex density: inverse mean distance to the k nearest neighbours."""
+    return k / (knn_distance_sum(vertices, k=k, tree=tree) + 1e-8)
+
+def adaptive_quantize(vertices, n_bins=1024, k=10, tree=None, density=None):
+    """Adaptive quantization based on local vertex density; pass `density` from knn_density to reuse it."""
+    if density is None:
+        density = knn_density(vertices, k=k, tree=tree)
+    elif len(density) != len(vertices):
+        raise ValueError(f"density has {len(density)} entries but {len(vertices)} vertices were given")
     density_norm = (density - density.min()) / (density.max() - density.min() + 1e-8)
     adaptive_bins = (n_bins * (0.5 + 0.5 * density_norm)).astype(int)
     adaptive_bins = np.clip(adaptive_bins, 16, n_bins)
 
-    quantized = []
-    for i in range(vertices.shape[0]):
-        v = np.clip(vertices[i], -1, 1)
-        bin_size = 2 / adaptive_bins[i]
-        q = np.floor((v + 1) / bin_size) * bin_size - 1
-        quantized.append(q)
-    return np.array(quantized)
+    bin_size = np.ascontiguousarray(2.0 / adaptive_bins, dtype=vertices.dtype)[:, None]
+    inv_bin_size = np.ascontiguousarray(adaptive_bins / 2.0, dtype=vertices.dtype)[:, None]
+
+    # Single output buffer; every step below runs in place
+    quantized = np.clip(vertices, -1, 1)
+    quantized += 1.0
+    quantized *= inv_bin_size
+    np.floor(quantized, out=quantized)
+    quantized *= bin_size
+    quantized -= 1.0
+    return quantized
 
 def uniform_quantize(vertices, n_bins=1024):
     """Simple uniform quantization."""
@@ -56,26 +82,13 @@ def uniform_quantize(vertices, n_bins=1024):
     return q
 
 def mse(a, b):
-    return np.mean((a - b) ** 2)
+    return np.mean((a.astype(np.float64) - b) ** 2, axis=(-2, -1))
 
 def generate_transforms(vertices, num_versions=5):
-    """Generate rotated & translated versions of the mesh."""
-    versions = []
-    for _ in range(num_versions):
-        theta = np.random.rand() * 2 * np.pi
-        axis = np.random.randn(3)
-        axis /= np.linalg.norm(axis)
-        c, s = np.cos(theta), np.sin(theta)
-        x, y, z = axis
-        R = np.array([
-            [c + x*x*(1-c), x*y*(1-c)-z*s, x*z*(1-c)+y*s],
-            [y*x*(1-c)+z*s, c + y*y*(1-c), y*z*(1-c)-x*s],
-            [z*x*(1-c)-y*s, z*y*(1-c)+x*s, c + z*z*(1-c)]
-        ])
-        t = np.random.uniform(-0.1, 0.1, 3)
-        v_new = vertices @ R.T + t
-        versions.append(v_new)
-    return versions
+    """Generate rotated & translated versions of the mesh as a (K, N, 3) array."""
+    R = Rotation.random(num=num_versions).as_matrix().astype(vertices.dtype)
+    t = np.random.uniform(-0.1, 0.1, (num_versions, 3)).astype(vertices.dtype)
+    return np.einsum("kij,nj->kni", R, vertices) + t[:, None, :]
 
 def main():
     mesh_path = "meshes/branch.obj"
@@ -84,22 +97,20 @@ def main():
     print(f"Loaded mesh with {len(vertices)} vertices for adaptive quantization test.")
 
     versions = generate_transforms(vertices, num_versions=5)
-    uniform_mses, adaptive_mses = [], []
-
-    for i, v in enumerate(versions, 1):
-        normalized, centroid, radius = normalize_unit_sphere(v)
-        uniform_q = uniform_quantize(normalized)
-        adaptive_q = adaptive_quantize(normalized)
 
-        recon_uniform = denormalize_unit_sphere(uniform_q, centroid, radius)
-        recon_adaptive = denormalize_unit_sphere(adaptive_q, centroid, radius)
+    normalized, centroid, radius = normalize_unit_sphere(versions)
+    uniform_q = uniform_quantize(normalized)
+    # Rotation, translation and unit-sphere scaling preserve neighbourhoods, so one density serves every version
+    density = knn_density(normalized[0])
+    adaptive_q = np.stack([adaptive_quantize(v, density=density) for v in normalized])
 
-        mse_u = mse(v, recon_uniform)
-        mse_a = mse(v, recon_adaptive)
+    recon_uniform = denormalize_unit_sphere(uniform_q, centroid, radius)
+    recon_adaptive = denormalize_unit_sphere(adaptive_q, centroid, radius)
 
-        uniform_mses.append(mse_u)
-        adaptive_mses.append(mse_a)
+    uniform_mses = mse(versions, recon_uniform)
+    adaptive_mses = mse(versions, recon_adaptive)
 
+    for i, (mse_u, mse_a) in enumerate(zip(uniform_mses, adaptive_mses), 1):
         print(f"Version {i}: Uniform MSE={mse_u:.6e}, Adaptive MSE={mse_a:.6e}")
 
     avg_uniform = np.mean(uniform_mses)
@@ -119,17 +130,17 @@ def main():
         f.write(f"Average Adaptive MSE: {avg_adaptive}\n")
 
     # Save plot
-    plt.figure(figsize=(7, 5))
-    plt.plot(uniform_mses, label="Uniform Quantization", marker="o")
-    plt.plot(adaptive_mses, label="Adaptive Quantization", marker="s")
-    plt.xlabel("Mesh Version")
-    plt.ylabel("MSE")
-    plt.title("Uniform vs Adaptive Quantization Error")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(os.path.join("outputs", "adaptive_vs_uniform_error.png"))
-    plt.close()
+    fig = Figure(figsize=(7, 5))
+    ax = fig.subplots()
+    ax.plot(uniform_mses, label="Uniform Quantization", marker="o")
+    ax.plot(adaptive_mses, label="Adaptive Quantization", marker="s")
+    ax.set_xlabel("Mesh Version")
+    ax.set_ylabel("MSE")
+    ax.set_title("Uniform vs Adaptive Quantization Error")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    FigureCanvasAgg(fig).print_png(os.path.join("outputs", "adaptive_vs_uniform_error.png"))
 
     print("Adaptive Quantization Experiment completed successfully.")
     print(f"Results saved to {results_path}")
@@ -9,12 +9,15 @@ Runs all components of the Mesh Assignment Project:
 
 Behavior:
 - Clears old files in /outputs and /testing_output before each run.
+- Runs steps 1-3 concurrently; integrity verification runs afterwards.
 - Saves all new results cleanly into these folders.
 """
 
 import subprocess
 import os
 import shutil
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 def ensure_directories(clean=False):
     """Ensure output directories exist, optionally clear old data."""
@@ -24,53 +27,83 @@ def ensure_directories(clean=False):
     if clean:
         # Clear contents of both folders before new run
         for folder in ["outputs", "testing_output"]:
-            for filename in os.listdir(folder):
-                file_path = os.path.join(folder, filename)
-                try:
-                    if os.path.isfile(file_path) or os.path.islink(file_path):
-                        os.unlink(file_path)
-                    elif os.path.isdir(file_path):
-                        shutil.rmtree(file_path)
-                except Exception as e:
-                    print(f"Warning: Failed to delete {file_path}: {e}")
-
-def run_command(command, description, log_file):
-    """Run a shell command and log the output."""
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_symlink() or entry.is_file():
+                            os.unlink(entry.path)
+                        elif entry.is_dir():
+                            shutil.rmtree(entry.path)
+                    except Exception as e:
+                        print(f"Warning: Failed to delete {entry.path}: {e}")
+
+def _print_banner(description):
     print("\n" + "=" * 70)
     print(f">>> Running: {description}")
     print("=" * 70)
+
+def _execute(command):
+    """Run a shell command, returning its CompletedProcess or the exception raised."""
     try:
-        result = subprocess.run(command, shell=True, text=True, capture_output=True)
-        with open(log_file, "a", encoding="utf-8") as log:
-            log.write(f"\n=== {description} ===\n")
-            log.write(result.stdout + "\n")
-            log.write(result.stderr + "\n")
-
-        if result.returncode == 0:
-            print(f"{description} completed successfully.")
-        else:
-            print(f"{description} encountered an error. Check log for details.")
+        return subprocess.run(command, shell=True, text=True, capture_output=True)
     except Exception as e:
-        print(f"Error running {description}: {e}")
+        return e
+
+def _log_result(result, description, log_file):
+    """Append a command's output to the log file and report its status."""
+    if isinstance(result, Exception):
+        print(f"Error running {description}: {result}")
         with open(log_file, "a", encoding="utf-8") as log:
-            log.write(f"Exception while running {description}: {e}\n")
+            log.write(f"Exception while running {description}: {result}\n")
+        return
+
+    with open(log_file, "a", encoding="utf-8") as log:
+        log.write(f"\n=== {description} ===\n")
+        log.write(result.stdout + "\n")
+        log.write(result.stderr + "\n")
+
+    if result.returncode == 0:
+        print(f"{description} completed successfully.")
+    else:
+        print(f"{description} encountered an error. Check log for details.")
+
+def run_command(command, description, log_file):
+    """Run a shell command and log the output."""
+    _print_banner(description)
+    _log_result(_execute(command), description, log_file)
+
+def run_commands_concurrently(commands, log_file):
+    """Run independent (command, description) pairs in parallel, logging them in order."""
+    for _, description in commands:
+        _print_banner(description)
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        futures = [executor.submit(_execute, command) for command, _ in commands]
+        for (_, description), future in zip(commands, futures):
+            _log_result(future.result(), description, log_file)
+
+OUTPUT_DIRS = {
+    ".csv": "outputs",
+    ".ply": "outputs",
+    ".png": "outputs",
+    ".txt": "outputs",
+}
+TEST_LOG_PATTERN = re.compile(r"^(test|.*integrity|.*run_log)")
 
 def move_all_outputs():
     """Move all generated files (.csv, .txt, .png, .ply) into their folders."""
-    for file in os.listdir("."):
-        if not os.path.isfile(file):
-            continue
-        if file.endswith((".csv", ".ply", ".png", ".txt")):
+    with os.scandir(".") as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            dest_dir = OUTPUT_DIRS.get(os.path.splitext(entry.name)[1])
+            if dest_dir is None:
+                continue
             # Separate outputs and test logs
-            if file.startswith("test") or "integrity" in file or "run_log" in file:
-                dest = os.path.join("testing_output", file)
-            else:
-                dest = os.path.join("outputs", file)
+            if TEST_LOG_PATTERN.match(entry.name):
+                dest_dir = "testing_output"
 
-            # Avoid duplication
-            if os.path.exists(dest):
-                os.remove(dest)
-            shutil.move(file, dest)
+            # os.replace overwrites any previous copy in a single rename
+            os.replace(entry.path, os.path.join(dest_dir, entry.name))
 
 def main():
     # Step 0: Clean and prepare folders
@@ -80,14 +113,12 @@ def main():
 
     print("\n========== MESH ASSIGNMENT PROJECT EXECUTION ==========\n")
 
-    # Step 1: Core Mesh Preprocessing
-    run_command("python mesh_preprocess.py", "Core Mesh Preprocessing (Normalization + Quantization)", log_file)
-
-    # Step 2: Seam Tokenization Prototype
-    run_command("python seam_tokenization.py", "Seam Tokenization Prototype (Bonus Task 1)", log_file)
-
-    # Step 3: Adaptive Quantization Experiment
-    run_command("python adaptive_quantization.py", "Adaptive Quantization Experiment (Bonus Task 2)", log_file)
+    # Steps 1-3: Core pipeline and bonus tasks are independent, so run them together
+    run_commands_concurrently([
+        ("python mesh_preprocess.py", "Core Mesh Preprocessing (Normalization + Quantization)"),
+        ("python seam_tokenization.py", "Seam Tokenization Prototype (Bonus Task 1)"),
+        ("python adaptive_quantization.py", "Adaptive Quantization Experiment (Bonus Task 2)"),
+    ], log_file)
 
     # Step 4: Move outputs so far
     move_all_outputs()
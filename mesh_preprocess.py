@@ -2,35 +2,21 @@ import os
 import sys
 import numpy as np
 import trimesh
-import matplotlib.pyplot as plt
 import csv
 
 def load_vertices(path):
     mesh = trimesh.load(path, process=False)
-    return np.asarray(mesh.vertices), mesh
+    return np.ascontiguousarray(mesh.vertices, dtype=np.float32), mesh
 
-def minmax_normalize(vertices):
-    v_min, v_max = vertices.min(axis=0), vertices.max(axis=0)
-    diff = np.where((v_max - v_min) == 0, 1e-9, v_max - v_min)
-    normalized = (vertices - v_min) / diff
-    meta = {"v_min": v_min, "v_max": v_max}
-    return normalized, meta
+def minmax_meta(vertices):
+    return {"v_min": vertices.min(axis=0), "v_max": vertices.max(axis=0)}
 
-def minmax_denormalize(normalized, meta):
-    v_min, v_max = meta["v_min"], meta["v_max"]
-    diff = np.where((v_max - v_min) == 0, 1e-9, v_max - v_min)
-    return normalized * diff + v_min
-
-def unit_sphere_normalize(vertices):
+def unit_sphere_meta(vertices):
     centroid = vertices.mean(axis=0)
     centered = vertices - centroid
-    radius = np.max(np.linalg.norm(centered, axis=1))
-    normalized = centered / radius
-    meta = {"centroid": centroid, "radius": radius}
-    return normalized, meta
-
-def unit_sphere_denormalize(normalized, meta):
-    return normalized * meta["radius"] + meta["centroid"]
+    # Max of squared norms, one sqrt at the end
+    radius = np.sqrt(np.einsum("ij,ij->i", centered, centered).max())
+    return {"centroid": centroid, "radius": radius}
 
 def quantize(values, n_bins=1024, input_range=(0, 1)):
     a, b = input_range
@@ -44,60 +30,149 @@ def dequantize(q, n_bins=1024, output_range=(0, 1)):
     mapped = q / (n_bins - 1)
     return mapped * (b - a) + a
 
-def mse(a, b):
-    return np.mean((a - b) ** 2)
-
-def mae(a, b):
-    return np.mean(np.abs(a - b))
+def _affine_params(meta):
+    if "radius" in meta:
+        return meta["radius"], meta["centroid"]
+    v_min, v_max = meta["v_min"], meta["v_max"]
+    return np.where((v_max - v_min) == 0, 1e-9, v_max - v_min), v_min
+
+def _grid_params(meta, n_bins, value_range):
+    # Fold normalization and the [a, b] bin range into one affine map: mesh = base + t * span, t in [0, 1]
+    a, b = value_range
+    scale, offset = _affine_params(meta)
+    base = offset + a * scale
+    span = (b - a) * scale
+    return base, span, span / (n_bins - 1)
+
+def quantize_grid(vertices, meta, n_bins=1024, value_range=(0, 1)):
+    base, span, step = _grid_params(meta, n_bins, value_range)
+
+    idx = np.subtract(vertices, base)
+    np.divide(idx, span, out=idx)
+    np.clip(idx, 0, 1, out=idx)
+    np.multiply(idx, np.float32(n_bins - 1), out=idx)
+    np.floor(idx, out=idx)
+    return idx, step, base
+
+def quantize_roundtrip(vertices, meta, n_bins=1024, value_range=(0, 1)):
+    idx, step, base = quantize_grid(vertices, meta, n_bins=n_bins, value_range=value_range)
+    reconstructed = np.multiply(idx, step)
+    reconstructed += base
+    return reconstructed, idx, step, base
+
+def reconstruction_errors(a, b):
+    # MSE and MAE from a single difference buffer
+    d = a.astype(np.float64) - b
+    err_mse = np.einsum("ij,ij->", d, d) / d.size
+    err_mae = np.abs(d, out=d).sum() / d.size
+    return err_mse, err_mae
+
+PLY_TYPES = {"ushort": "<u2", "float": "<f4", "double": "<f8"}
+
+def export_quantized_ply(path, idx, step, base, faces, uv=None):
+    # Grid indices as ushort; x = qx * scale + offset with per-axis scale/offset in the header
+    if idx.size and idx.max() > np.iinfo(np.uint16).max:
+        raise ValueError("Quantized PLY export supports at most 65536 bins per axis")
+    faces = np.asarray(faces)
+    scale = np.broadcast_to(np.asarray(step, dtype=np.float32), (3,))
+    offset = np.broadcast_to(np.asarray(base, dtype=np.float32), (3,))
+
+    properties = [("ushort", "qx"), ("ushort", "qy"), ("ushort", "qz")]
+    if uv is not None:
+        # Texture coordinates are kept as doubles, matching trimesh's own PLY export
+        properties += [("double", "s"), ("double", "t")]
+    vertex_block = np.empty(len(idx), dtype=[(name, PLY_TYPES[kind]) for kind, name in properties])
+    vertex_block["qx"], vertex_block["qy"], vertex_block["qz"] = idx.T
+    if uv is not None:
+        vertex_block["s"], vertex_block["t"] = np.asarray(uv).T
+
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        "comment quant_scale " + " ".join(repr(float(x)) for x in scale),
+        "comment quant_offset " + " ".join(repr(float(x)) for x in offset),
+        f"element vertex {len(idx)}",
+    ]
+    header += [f"property {kind} {name}" for kind, name in properties]
+    header += [
+        f"element face {len(faces)}",
+        "property list uchar int vertex_indices",
+        "end_header",
+    ]
+
+    face_block = np.empty(len(faces), dtype=[("n", "u1"), ("v", "<i4", (3,))])
+    face_block["n"] = 3
+    face_block["v"] = faces
+    with open(path, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        f.write(vertex_block.tobytes())
+        f.write(face_block.tobytes())
+
+def load_quantized_ply(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    header_end = data.index(b"end_header\n") + len(b"end_header\n")
+    counts, params, vertex_fields = {}, {}, []
+    element = None
+    for line in data[:header_end].decode("ascii").splitlines():
+        parts = line.split()
+        if parts[0] == "element":
+            element = parts[1]
+            counts[element] = int(parts[2])
+        elif parts[0] == "property" and element == "vertex":
+            vertex_fields.append((parts[2], PLY_TYPES[parts[1]]))
+        elif parts[0] == "comment" and parts[1] in ("quant_scale", "quant_offset"):
+            params[parts[1]] = np.array(parts[2:5], dtype=np.float32)
+
+    vertex_dtype = np.dtype(vertex_fields)
+    vertex_block = np.frombuffer(data, dtype=vertex_dtype, count=counts["vertex"], offset=header_end)
+    face_dtype = np.dtype([("n", "u1"), ("v", "<i4", (3,))])
+    face_block = np.frombuffer(data, dtype=face_dtype, count=counts["face"], offset=header_end + vertex_block.nbytes)
+
+    q = np.stack([vertex_block["qx"], vertex_block["qy"], vertex_block["qz"]], axis=1)
+    vertices = q.astype(np.float32) * params["quant_scale"] + params["quant_offset"]
+    uv = None
+    if "s" in vertex_dtype.names:
+        uv = np.stack([vertex_block["s"], vertex_block["t"]], axis=1)
+    return vertices, face_block["v"].astype(np.int64), uv
 
 def process_mesh(mesh_path, n_bins=1024):
     vertices, mesh_obj = load_vertices(mesh_path)
     mesh_name = os.path.basename(mesh_path)
     print(f"\nProcessing: {mesh_name} ({len(vertices)} vertices)")
 
-    results = []
-
     for method in ["minmax", "unit_sphere"]:
         if method == "minmax":
-            normalized, meta = minmax_normalize(vertices)
-            q = quantize(normalized, n_bins=n_bins, input_range=(0, 1))
-            deq = dequantize(q, n_bins=n_bins, output_range=(0, 1))
-            reconstructed = minmax_denormalize(deq, meta)
+            meta = minmax_meta(vertices)
+            reconstructed, idx, step, base = quantize_roundtrip(vertices, meta, n_bins=n_bins, value_range=(0, 1))
         else:
-            normalized, meta = unit_sphere_normalize(vertices)
-            q = quantize(normalized, n_bins=n_bins, input_range=(-1, 1))
-            deq = dequantize(q, n_bins=n_bins, output_range=(-1, 1))
-            reconstructed = unit_sphere_denormalize(deq, meta)
+            meta = unit_sphere_meta(vertices)
+            reconstructed, idx, step, base = quantize_roundtrip(vertices, meta, n_bins=n_bins, value_range=(-1, 1))
 
-        err_mse, err_mae = mse(vertices, reconstructed), mae(vertices, reconstructed)
+        err_mse, err_mae = reconstruction_errors(vertices, reconstructed)
         print(f"{method} -> MSE={err_mse:.8f}, MAE={err_mae:.8f}")
 
         out_name = f"reconstructed_{method}_{os.path.splitext(mesh_name)[0]}.ply"
-        mesh_obj.vertices = reconstructed
-        mesh_obj.export(out_name)
+        export_quantized_ply(out_name, idx, step, base, mesh_obj.faces, uv=getattr(mesh_obj.visual, "uv", None))
 
-        results.append({
+        yield {
             "mesh": mesh_name,
             "method": method,
             "mse": err_mse,
             "mae": err_mae
-        })
-
-    return results
+        }
 
 def run_all(mesh_dir="meshes", n_bins=1024):
-    all_results = []
     obj_files = [f for f in os.listdir(mesh_dir) if f.endswith(".obj")]
 
-    for obj_file in obj_files:
-        mesh_path = os.path.join(mesh_dir, obj_file)
-        results = process_mesh(mesh_path, n_bins)
-        all_results.extend(results)
-
+    # Rows are written as each mesh finishes so partial progress survives a crash
     with open("results_summary.csv", "w", newline="") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=["mesh", "method", "mse", "mae"])
         writer.writeheader()
-        writer.writerows(all_results)
+        for obj_file in obj_files:
+            mesh_path = os.path.join(mesh_dir, obj_file)
+            writer.writerows(process_mesh(mesh_path, n_bins))
+            csvfile.flush()
 
     print("\nAll meshes processed successfully. Summary saved to results_summary.csv")
 
@@ -1,25 +1,17 @@
+import numpy as np
 import trimesh
 
 def identify_mock_seams(mesh):
-    seams = []
-    faces = mesh.faces
-    for face in faces:
-        edges = [(face[i], face[(i + 1) % 3]) for i in range(3)]
-        for v1, v2 in edges:
-            if abs(v1 - v2) % 5 == 0:
-                seams.append((v1, v2))
-    return seams
+    faces = np.asarray(mesh.faces)
+    edges = np.stack([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]], axis=1).reshape(-1, 2)
+    mask = (edges[:, 0] - edges[:, 1]) % 5 == 0
+    return edges[mask]
 
 def encode_seams(seams):
-    return [f"SEAM_{v1}_{v2}" for v1, v2 in seams]
+    return [f"SEAM_{v1}_{v2}" for v1, v2 in np.asarray(seams).tolist()]
 
 def decode_tokens(tokens):
-    edges = []
-    for token in tokens:
-        parts = token.split("_")
-        v1, v2 = int(parts[1]), int(parts[2])
-        edges.append((v1, v2))
-    return edges
+    return np.array([token.split("_")[1:3] for token in tokens], dtype=np.int64).reshape(-1, 2)
 
 def main():
     print("=== Seam Tokenization Prototype ===")
@@ -32,7 +24,7 @@ def main():
     print("Example tokens:", tokens[:10])
 
     decoded_edges = decode_tokens(tokens)
-    print("Decoded edges (sample):", decoded_edges[:5])
+    print("Decoded edges (sample):", decoded_edges[:5].tolist())
 
     with open("seam_tokens.txt", "w") as f:
         for t in tokens:
@@ -10,10 +10,10 @@ Verifies:
 
 import os
 import subprocess
-import trimesh
 import csv
 import sys
 from datetime import datetime
+from mesh_preprocess import load_quantized_ply
 
 def run_script(command):
     try:
@@ -53,13 +53,14 @@ def check_csv_validity(csv_path):
         print(f"Error reading CSV: {e}")
         return False
 
-def check_mesh_load(path):
+def check_reconstructed_load(path):
     try:
-        mesh = trimesh.load(path)
-        print(f"Mesh loaded successfully: {path} ({len(mesh.vertices)} vertices)")
+        vertices, faces, uv = load_quantized_ply(path)
+        uv_note = ", with UVs" if uv is not None else ""
+        print(f"Reconstructed mesh loaded successfully: {path} ({len(vertices)} vertices, {len(faces)} faces{uv_note})")
         return True
     except Exception as e:
-        print(f"Failed to load mesh {path}: {e}")
+        print(f"Failed to load reconstructed mesh {path}: {e}")
         return False
 
 def main():
@@ -81,7 +82,7 @@ def main():
     recon_files = [f for f in os.listdir(".") if f.startswith("reconstructed_") and f.endswith(".ply")]
     if recon_files:
         print(f"Found {len(recon_files)} reconstructed meshes.")
-        check_mesh_load(recon_files[0])
+        check_reconstructed_load(recon_files[0])
     else:
         print("No reconstructed mesh files found.")
         success = False